@@ -1,44 +1,90 @@
 import dash
-from dash import dcc, html, Input, Output
+from dash import DiskcacheManager, dcc, html, Input, Output, Patch, State
 import dash_bootstrap_components as dbc
+import diskcache
+from flask_caching import Cache
+import ijson
+import numpy as np
 import pandas as pd
-import json
 import plotly.express as px
-import plotly.colors as colors
 import plotly.graph_objs as go
 
-# Load and process GeoJSON data
-with open("data.geojson") as f:
-    data_complete_geojson = json.load(f)
-
-# Extract data into DataFrame
-points = []
-for feature in data_complete_geojson["features"]:
-    coords = feature["geometry"]["coordinates"]
-    props = feature["properties"]
-    points.append({
-        "lon": coords[0],
-        "lat": coords[1],
-        "NAMOBJ": props.get("NAMOBJ", "Unknown"),
-        "Status": props.get("Status", 0),
-        "Update_1": props.get("Update_1"),
-        "Update_2": props.get("Update_2"),
-        "Update_3": props.get("Update_3"),
-        "Update_4": props.get("Update_4"),
-        "Update_5": props.get("Update_5")
-    })
-
-# Convert to DataFrame and parse date columns
-df_points = pd.DataFrame(points)
-for i in range(1, 6):
-    df_points[f"Update_{i}"] = pd.to_datetime(df_points[f"Update_{i}"], format='%d-%m-%Y', errors='coerce')
-
-# Set up colors for Status
-status_range = df_points["Status"].max() - df_points["Status"].min()
-viridis_colors = colors.sample_colorscale("Viridis", [i / status_range for i in range(status_range + 1)], colortype="rgb")
-status_color_map = {status: viridis_colors[status] for status in range(df_points["Status"].min(), df_points["Status"].max() + 1)}
+# Stream the GeoJSON feature by feature into column lists, so peak memory is
+# one feature plus the columns we keep rather than the whole parsed document
+update_cols = [f"Update_{i}" for i in range(1, 6)]
+columns = {col: [] for col in ["lon", "lat", "NAMOBJ", "Status"] + update_cols}
+with open("data.geojson", "rb") as f:
+    for feature in ijson.items(f, "features.item"):
+        coords = feature["geometry"]["coordinates"]
+        props = feature["properties"]
+        columns["lon"].append(float(coords[0]))
+        columns["lat"].append(float(coords[1]))
+        columns["NAMOBJ"].append(props.get("NAMOBJ", "Unknown"))
+        columns["Status"].append(int(props.get("Status", 0)))
+        for col in update_cols:
+            columns[col].append(props.get(col))
+
+# Build the DataFrame from the dict of columns in one shot
+df_points = pd.DataFrame(columns)
+# NAMOBJ is a low-cardinality repeated string; as a Categorical, isin and
+# groupby hash small integer codes instead of strings
+df_points["NAMOBJ"] = df_points["NAMOBJ"].astype("category")
+
+# Hover labels are static per point, so concatenate them once at import and
+# just slice per filter instead of rebuilding strings in every callback
+df_points["_hover"] = df_points["NAMOBJ"].astype(str) + " - Status: " + df_points["Status"].astype(str)
+
+# Parse all five date columns in a single to_datetime call; cache=True parses
+# each distinct date string only once
+parsed = pd.to_datetime(df_points[update_cols].values.ravel(), format='%d-%m-%Y', errors='coerce', cache=True)
+df_points[update_cols] = parsed.values.reshape(len(df_points), len(update_cols))
+
+# Precompute per-stage data once: the stage DataFrames, slider dates and marks
+# never change, so the slider callbacks only need to filter and plot
+STAGE_CACHE = {}
+for stage in range(1, 6):
+    stage_col = f"Update_{stage}"
+    stage_df = df_points[df_points[stage_col].notna()].sort_values(stage_col)
+    unique_dates = np.array(sorted(stage_df[stage_col].unique()))
+    STAGE_CACHE[stage] = {
+        "df": stage_df,
+        "dates": unique_dates,
+        "marks": {i: pd.Timestamp(date).strftime('%d-%m-%Y') for i, date in enumerate(unique_dates)},
+        "max_date": unique_dates[-1] if len(unique_dates) else None,
+        # Raw numpy views so the hot filter-and-count path skips pandas entirely
+        "date_vals": stage_df[stage_col].to_numpy(),
+        "codes": stage_df["NAMOBJ"].cat.codes.to_numpy()
+    }
+
+# Pre-aggregated completion-date counts per stage for the summary progress
+# charts; the callback only has to filter these small tables by NAMOBJ
+PRESUMS = {
+    stage: df_points.groupby(["NAMOBJ", f"Update_{stage}"], observed=True, sort=False).size().reset_index(name="count").sort_values(f"Update_{stage}")
+    for stage in range(1, 6)
+}
+
+# Status colors are mapped client-side from the raw values against the
+# Viridis scale, so no per-point RGB strings are built or shipped
+STATUS_MAX = int(df_points["Status"].max())
 custom_color_map = ['#636EFA', '#EF553B', '#00CC96', '#AB63FA']
 
+# Stable NAMOBJ -> color assignment, built once from the Categorical's
+# categories so colors never shift with the active filter
+GLOBAL_COLOR_MAP = {namobj: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)] for i, namobj in enumerate(df_points["NAMOBJ"].cat.categories)}
+
+# Per-point columns shipped once to the browser so the summary map can be
+# rebuilt clientside without a server round-trip. Kept as numpy arrays rather
+# than per-point dicts: orjson serializes ndarrays directly, so the payload
+# skips both the record allocation and the stdlib-json encoder
+map_store_data = {
+    "lat": df_points["lat"].to_numpy(),
+    "lon": df_points["lon"].to_numpy(),
+    "NAMOBJ": df_points["NAMOBJ"].astype(str).to_numpy(),
+    "status": df_points["Status"].to_numpy(),
+    "status_max": STATUS_MAX,
+    "text": df_points["_hover"].to_numpy()
+}
+
 # Define the navigation bar with links to different pages
 navbar = dbc.Navbar(
     dbc.Container([
@@ -60,12 +106,24 @@ navbar = dbc.Navbar(
     className="mb-4"
 )
 
+# Background callbacks run on a diskcache job queue so a slow figure build
+# does not block the server for other users
+background_callback_manager = DiskcacheManager(diskcache.Cache("./cache"))
+
 # Initialize Dash app with Bootstrap theme
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY], suppress_callback_exceptions=True)
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY], suppress_callback_exceptions=True, background_callback_manager=background_callback_manager)
 server = app.server
 
+# Memoize callback results: selections and slider positions repeat, so serve
+# recomputed figures from cache instead of re-running pandas/plotly. The cache
+# lives on disk because background callbacks run in separate worker processes,
+# which an in-memory SimpleCache would not reach
+cache = Cache(server, config={"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": "./cache/memoize", "CACHE_DEFAULT_TIMEOUT": 3600})
+
 # Summary page layout
 summary_layout = dbc.Container([
+    dcc.Store(id="points-store", data=map_store_data),
+
     # Filter checklist
     # Filter checklist
     dbc.Row([
@@ -108,11 +166,26 @@ summary_layout = dbc.Container([
     dbc.Row([dbc.Col(dbc.Card([dbc.CardHeader("Progress Stages"), dbc.CardBody(html.Div(id="progress-plots-container"))]), width=12)], className="mb-4")
 ], fluid=True)
 
-# Layout for each stage page
+# Static layout for the stage maps, built once and patched per slider tick
+stage_map_layout = go.Layout(
+    mapbox={
+        "style": "open-street-map",
+        "center": {"lat": -7.9, "lon": 110.4},
+        "zoom": 12
+    },
+    margin={"r": 0, "t": 0, "l": 0, "b": 0},
+    paper_bgcolor="#2c2f33",
+    font={"color": "white"},
+    legend={"title": "NAMOBJ"},
+    uirevision="stage-map"
+)
+
+# Layout for each stage page; slider range and marks are static per stage
 def create_stage_layout(stage):
+    stage_cache = STAGE_CACHE[stage]
     return dbc.Container([
-        dbc.Row([dbc.Col(html.Label(f"Stage {stage} Completion Date")), dbc.Col(dcc.Slider(id=f"date-slider-{stage}", min=0, max=1, value=0, marks={}, tooltip={"placement": "bottom", "always_visible": True}), width=10)], className="my-4"),
-        dbc.Row([dbc.Col(dcc.Graph(id=f"progress-map-{stage}", style={"height": "600px"}), width=8), dbc.Col(dcc.Graph(id=f"namobj-bar-{stage}", style={"height": "600px"}), width=4)], className="my-4")
+        dbc.Row([dbc.Col(html.Label(f"Stage {stage} Completion Date")), dbc.Col(dcc.Slider(id=f"date-slider-{stage}", min=0, max=max(len(stage_cache["dates"]) - 1, 1), value=0, marks=stage_cache["marks"], tooltip={"placement": "bottom", "always_visible": True}), width=10)], className="my-4"),
+        dbc.Row([dbc.Col(dcc.Graph(id=f"progress-map-{stage}", figure=go.Figure(layout=stage_map_layout), style={"height": "600px"}), width=8), dbc.Col(dcc.Graph(id=f"namobj-bar-{stage}", style={"height": "600px"}), width=4)], className="my-4")
     ], fluid=True)
 
 # Main layout with navigation links
@@ -131,120 +204,154 @@ def display_page(pathname):
         try:
             stage = int(pathname.split("-")[1])
             return create_stage_layout(stage)
-        except (IndexError, ValueError):
+        except (IndexError, ValueError, KeyError):
             return html.H1("Invalid Page")
     return html.H1("404 - Page Not Found")
 
-# Summary page callback
-@app.callback(
-    [Output("map", "figure"), Output("status-bar-plot", "figure"), Output("progress-plots-container", "children")],
-    [Input("namobj-checklist", "value")]
+# Summary map callback, run clientside so checkbox toggles never hit the server
+app.clientside_callback(
+    """
+    function(selected_namobj, points) {
+        const selected = new Set(selected_namobj);
+        const lat = [], lon = [], status = [], text = [];
+        let lat_sum = 0, lon_sum = 0;
+        for (let i = 0; i < points.lat.length; i++) {
+            if (!selected.has(points.NAMOBJ[i])) continue;
+            lat.push(points.lat[i]);
+            lon.push(points.lon[i]);
+            status.push(points.status[i]);
+            text.push(points.text[i]);
+            lat_sum += points.lat[i];
+            lon_sum += points.lon[i];
+        }
+        const center = lat.length
+            ? {lat: lat_sum / lat.length, lon: lon_sum / lat.length}
+            : {lat: -7.9, lon: 110.4};
+        return {
+            data: [{
+                type: "scattermapbox", lat: lat, lon: lon, mode: "markers",
+                marker: {size: 8, color: status, colorscale: "Viridis", cmin: 0, cmax: points.status_max, opacity: 0.6},
+                text: text, hoverinfo: "text"
+            }],
+            layout: {
+                mapbox: {style: "open-street-map", center: center, zoom: 12},
+                margin: {r: 0, t: 0, l: 0, b: 0},
+                paper_bgcolor: "#2c2f33", font: {color: "white"},
+                uirevision: "summary-map"
+            }
+        };
+    }
+    """,
+    Output("map", "figure"),
+    Input("namobj-checklist", "value"),
+    State("points-store", "data")
 )
-def update_dashboard(selected_namobj):
-    filtered_df = df_points[df_points["NAMOBJ"].isin(selected_namobj)].copy()
-    center_lat, center_lon = (-7.9, 110.4) if filtered_df.empty else (filtered_df["lat"].mean(), filtered_df["lon"].mean())
 
-    map_fig = go.Figure(data=[
-        go.Scattermapbox(
-            lat=filtered_df["lat"], lon=filtered_df["lon"], mode="markers",
-            marker={"size": 8, "color": filtered_df["Status"].map(status_color_map), "opacity": 0.6},
-            text=filtered_df["NAMOBJ"] + " - Status: " + filtered_df["Status"].astype(str),
-            hoverinfo="text"
-        )
-    ], layout=go.Layout(
-        mapbox={"style": "open-street-map", "center": {"lat": center_lat, "lon": center_lon}, "zoom": 12},
-        margin={"r": 0, "t": 0, "l": 0, "b": 0}, paper_bgcolor="#2c2f33", font={"color": "white"}
-    ))
+# Summary figures, memoized per checklist selection
+@cache.memoize()
+def compute_summary_figures(selected_namobj):
+    # No .copy(): everything below only reads from the filtered view
+    filtered_df = df_points[df_points["NAMOBJ"].isin(selected_namobj)]
 
-    bar_df = filtered_df.groupby(["NAMOBJ", "Status"]).size().reset_index(name="Count")
+    # observed=True keeps the categorical groupby to the combinations that
+    # actually occur, and sort=False skips the lexsort on the group keys
+    bar_df = filtered_df.groupby(["NAMOBJ", "Status"], observed=True, sort=False).size().reset_index(name="Count")
     bar_fig = px.bar(bar_df, x="NAMOBJ", y="Count", color="Status", color_continuous_scale="Viridis", labels={"Count": "Status Count", "NAMOBJ": "NAMOBJ"}, title="Status Count per NAMOBJ")
     bar_fig.update_layout(paper_bgcolor="#2c2f33", plot_bgcolor="#2c2f33", font=dict(color="white"))
 
     progress_plots = []
     for stage in range(1, 6):
-        stage_df = filtered_df[filtered_df[f"Update_{stage}"].notna()]
-        if not stage_df.empty:
-            grouped_df = stage_df.groupby(["NAMOBJ", f"Update_{stage}"]).size().reset_index(name="count").sort_values(by=f"Update_{stage}")
+        presum = PRESUMS[stage]
+        grouped_df = presum[presum["NAMOBJ"].isin(selected_namobj)]
+        if not grouped_df.empty:
             fig = px.bar(grouped_df, x=f"Update_{stage}", y="count", color="NAMOBJ", title=f"Progress Stage {stage} Completion Dates", labels={f"Update_{stage}": "Date", "count": "Number of Points"}, color_discrete_sequence=custom_color_map)
             fig.update_layout(xaxis=dict(type='category'), paper_bgcolor="#2c2f33", plot_bgcolor="#2c2f33", font=dict(color="white"))
             progress_plots.append(dcc.Graph(figure=fig))
 
-    return map_fig, bar_fig, progress_plots
+    return bar_fig, progress_plots
 
-# Callback for each stage map and bar chart
+# Summary page callback, run in the background so rebuilding the progress
+# figures never blocks the server; the checklist is dimmed while it runs
+@app.callback(
+    [Output("status-bar-plot", "figure"), Output("progress-plots-container", "children")],
+    [Input("namobj-checklist", "value")],
+    background=True,
+    running=[(Output("namobj-checklist", "className"), "pe-none opacity-50", "")]
+)
+def update_dashboard(selected_namobj):
+    # Tuple so repeated selections hit the memoize cache
+    return compute_summary_figures(tuple(selected_namobj))
 
-for stage in range(1, 6):
-    @app.callback(
-        [Output(f"date-slider-{stage}", "min"), Output(f"date-slider-{stage}", "max"),
-         Output(f"date-slider-{stage}", "marks"), Output(f"progress-map-{stage}", "figure"),
-         Output(f"namobj-bar-{stage}", "figure")],
-        [Input(f"date-slider-{stage}", "value")]
-    )
-    def update_map_and_bar(slider_value, stage=stage):
-        stage_col = f"Update_{stage}"
-        stage_df = df_points[df_points[stage_col].notna()]
-
-        if stage_df.empty:
-            return 0, 1, {}, {}, {}
-
-        # Get unique dates and create slider range
-        unique_dates = sorted(stage_df[stage_col].dropna().unique())
-        date_marks = {i: date.strftime('%d-%m-%Y') for i, date in enumerate(unique_dates)}
-        slider_index = int(slider_value)
-        date_selected = unique_dates[slider_index] if slider_index < len(unique_dates) else unique_dates[-1]
-
-        # Filter points up to selected date
-        filtered_df = stage_df[stage_df[stage_col] <= date_selected]
-        
-        # Generate color map for NAMOBJ values
-        unique_namobjs = filtered_df["NAMOBJ"].unique()
-        color_map = {namobj: color for namobj, color in zip(unique_namobjs, px.colors.qualitative.Plotly)}
-
-        # Create map traces
-        map_traces = [
-            go.Scattermapbox(
-                lat=filtered_df[filtered_df["NAMOBJ"] == namobj]["lat"],
-                lon=filtered_df[filtered_df["NAMOBJ"] == namobj]["lon"],
-                mode="markers",
-                marker={"size": 8, "color": color_map[namobj], "opacity": 0.6},
-                name=namobj,
-                showlegend=True,
-                hoverinfo="text",
-                text=filtered_df[filtered_df["NAMOBJ"] == namobj]["NAMOBJ"] + " - Status: " + filtered_df["Status"].astype(str)
-            ) for namobj in unique_namobjs
-        ]
-
-        map_layout = go.Layout(
-            mapbox={
-                "style": "open-street-map",
-                "center": {"lat": -7.9, "lon": 110.4},
-                "zoom": 12
-            },
-            margin={"r": 0, "t": 0, "l": 0, "b": 0},
-            paper_bgcolor="#2c2f33",
-            font={"color": "white"},
-            legend={"title": "NAMOBJ"}
-        )
-        map_fig = go.Figure(data=map_traces, layout=map_layout)
+# Stage figures, memoized per (stage, slider position)
+@cache.memoize()
+def compute_stage_figures(stage, slider_index):
+    stage_cache = STAGE_CACHE[stage]
+    stage_df = stage_cache["df"]
+
+    if stage_df.empty:
+        return [], {}
+
+    unique_dates = stage_cache["dates"]
+    date_selected = unique_dates[slider_index] if slider_index < len(unique_dates) else stage_cache["max_date"]
 
-        # Create bar chart for NAMOBJ counts
-        bar_df = filtered_df["NAMOBJ"].value_counts().reset_index()
-        bar_df.columns = ["NAMOBJ", "Count"]
+    # stage_df is pre-sorted by date, so the points up to the selected date are
+    # a prefix: binary-search the cutoff and slice instead of masking every row
+    cut = np.searchsorted(stage_cache["date_vals"], date_selected, side="right")
+    filtered_df = stage_df.iloc[:cut]
+    color_map = GLOBAL_COLOR_MAP
+
+    # Create map traces with a single groupby pass instead of one boolean
+    # mask per NAMOBJ
+    map_traces = [
+        go.Scattermapbox(
+            lat=sub["lat"].values,
+            lon=sub["lon"].values,
+            mode="markers",
+            marker={"size": 8, "color": color_map[namobj], "opacity": 0.6},
+            cluster={"enabled": True, "maxzoom": 14},
+            name=namobj,
+            showlegend=True,
+            hoverinfo="text",
+            text=sub["_hover"].values
+        ) for namobj, sub in filtered_df.groupby("NAMOBJ", sort=False, observed=True)
+    ]
 
-        bar_fig = px.bar(
-            bar_df, x="NAMOBJ", y="Count",
-            color="NAMOBJ",
-            color_discrete_map=color_map,
+    # Create bar chart for NAMOBJ counts straight from go.Bar; bincount over
+    # the cached category codes replaces value_counts, dropping the groups the
+    # filter left empty
+    counts = np.bincount(stage_cache["codes"][:cut], minlength=len(df_points["NAMOBJ"].cat.categories))
+    present = counts > 0
+    bar_names = df_points["NAMOBJ"].cat.categories.to_numpy()[present]
+    bar_fig = go.Figure(
+        data=[go.Bar(
+            x=bar_names,
+            y=counts[present],
+            marker_color=[color_map[namobj] for namobj in bar_names]
+        )],
+        layout=go.Layout(
             title="Number of Points per NAMOBJ",
-            labels={"NAMOBJ": "NAMOBJ", "Count": "Point Count"}
-        )
-        bar_fig.update_layout(
+            xaxis={"title": "NAMOBJ"},
+            yaxis={"title": "Point Count"},
             paper_bgcolor="#2c2f33",
             plot_bgcolor="#2c2f33",
-            font=dict(color="white")
+            font={"color": "white"}
         )
+    )
+
+    return map_traces, bar_fig
+
+# Callback for each stage map and bar chart
 
-        return 0, len(unique_dates) - 1, date_marks, map_fig, bar_fig
+for stage in range(1, 6):
+    @app.callback(
+        [Output(f"progress-map-{stage}", "figure"), Output(f"namobj-bar-{stage}", "figure")],
+        [Input(f"date-slider-{stage}", "value")]
+    )
+    def update_map_and_bar(slider_value, stage=stage):
+        map_traces, bar_fig = compute_stage_figures(stage, int(slider_value))
+        map_patch = Patch()
+        map_patch["data"] = map_traces
+        return map_patch, bar_fig
 
 if __name__ == "__main__":
     app.run_server(debug=True, port=8051)